@@ -4,8 +4,10 @@ from typing import Any, Dict, List, Tuple
 
 import joblib
 import numpy as np
+import orjson
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 import streamlit as st
 
 
@@ -21,12 +23,19 @@ DEFAULT_API_URL = os.getenv(
 def build_sample_payload(batch_size: int = 2) -> Dict[str, List[List[float]]]:
     """Return a sample payload with the right shape for quick testing."""
     vector = [0.0] * EXPECTED_VECTOR_LENGTH
-    return {"features": [vector for _ in range(batch_size)]}
+    # Rows share one list object; fine since the payload is only serialized
+    return {"features": [vector] * batch_size}
+
+
+@st.cache_data(show_spinner=False)
+def build_sample_payload_json(batch_size: int = 2) -> str:
+    """Sample payload as pretty JSON, memoized per batch size across reruns."""
+    return json.dumps(build_sample_payload(batch_size), indent=2)
 
 
 def validate_payload(raw_text: str) -> Dict[str, Any]:
     """Parse and validate that the payload matches the API contract."""
-    data = json.loads(raw_text)
+    data = orjson.loads(raw_text)
     if not isinstance(data, dict):
         raise ValueError("Payload must be a JSON object with a 'features' key.")
 
@@ -34,27 +43,44 @@ def validate_payload(raw_text: str) -> Dict[str, Any]:
     if not isinstance(features, list) or not features:
         raise ValueError("The 'features' field must be a non-empty list of vectors.")
 
-    clean_vectors: List[List[float]] = []
-    for index, vector in enumerate(features):
-        if not isinstance(vector, list):
-            raise ValueError(f"Vector at index {index} is not a list.")
-        if len(vector) != EXPECTED_VECTOR_LENGTH:
-            raise ValueError(
-                f"Vector at index {index} has length {len(vector)}, "
-                f"expected {EXPECTED_VECTOR_LENGTH}."
-            )
-        try:
-            clean_vectors.append([float(x) for x in vector])
-        except Exception:
-            raise ValueError(f"Vector at index {index} contains non-numeric values.")
+    # One C-level pass for shape + dtype; only walk the vectors to report which one is bad
+    try:
+        arr = np.asarray(features, dtype=np.float64)
+    except (ValueError, TypeError):
+        arr = None
+    if arr is None or arr.ndim != 2 or arr.shape[1] != EXPECTED_VECTOR_LENGTH or np.isnan(arr).any():
+        for index, vector in enumerate(features):
+            if not isinstance(vector, list):
+                raise ValueError(f"Vector at index {index} is not a list.")
+            if len(vector) != EXPECTED_VECTOR_LENGTH:
+                raise ValueError(
+                    f"Vector at index {index} has length {len(vector)}, "
+                    f"expected {EXPECTED_VECTOR_LENGTH}."
+                )
+        raise ValueError("Vectors contain non-numeric values.")
+
+    return {"features": arr.tolist()}
+
 
-    return {"features": clean_vectors}
+@st.cache_resource(show_spinner=False)
+def get_session() -> requests.Session:
+    """Keep-alive session shared across reruns so the TLS handshake is paid once."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 def call_predict(api_url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    response = requests.post(api_url, json=payload, timeout=30)
+    response = get_session().post(
+        api_url,
+        data=orjson.dumps(payload),
+        headers={"Content-Type": "application/json"},
+        timeout=30,
+    )
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
 
 
 @st.cache_resource(show_spinner=False)
@@ -75,67 +101,99 @@ def load_encoder() -> Tuple[Any, Dict[str, Any], Dict[str, List[str]]]:
     return preprocessor, meta, cat_options
 
 
+@st.cache_resource(show_spinner=False)
+def load_encoding_index() -> Dict[str, Dict[str, Any]]:
+    """Flatten the fitted ColumnTransformer into output offsets and imputer fill values.
+
+    numeric: col -> (offset, median fill); categorical: col -> ({category: offset}, mode fill).
+    """
+    preprocessor, _, _ = load_encoder()
+    num_pipe = preprocessor.named_transformers_["num"]
+    cat_pipe = preprocessor.named_transformers_["cat"]
+    num_cols = next(cols for name, _, cols in preprocessor.transformers_ if name == "num")
+    cat_cols = next(cols for name, _, cols in preprocessor.transformers_ if name == "cat")
+
+    num_fills = num_pipe.named_steps["imputer"].statistics_
+    numeric = {
+        col: (offset, float(fill)) for offset, (col, fill) in enumerate(zip(num_cols, num_fills))
+    }
+    categorical = {}
+    offset = len(num_cols)
+    cat_fills = cat_pipe.named_steps["imputer"].statistics_
+    cat_levels = cat_pipe.named_steps["onehot"].categories_
+    for col, categories, fill in zip(cat_cols, cat_levels, cat_fills):
+        categorical[col] = ({str(c): offset + i for i, c in enumerate(categories)}, str(fill))
+        offset += len(categories)
+    return {"numeric": numeric, "categorical": categorical, "length": offset}
+
+
 def build_vector_from_form(
-    preprocessor: Any,
+    encoding_index: Dict[str, Any],
     numeric_inputs: Dict[str, float],
     cat_inputs: Dict[str, str],
 ) -> List[float]:
-    """Build a single 91-length vector using the fitted preprocessor."""
-    row = {}
-    row.update(numeric_inputs)
-    row.update(cat_inputs)
-    df = pd.DataFrame([row])
-    arr = preprocessor.transform(df)
-    if hasattr(arr, "toarray"):
-        arr = arr.toarray()
-    vec = np.asarray(arr)[0].tolist()
-    if len(vec) != EXPECTED_VECTOR_LENGTH:
-        raise ValueError(f"Encoded vector length {len(vec)} != {EXPECTED_VECTOR_LENGTH}")
-    return vec
-
+    """Build a single 91-length vector by writing straight into the encoded offsets.
 
-def render_results(results: List[Dict[str, Any]], risk_threshold: float):
-    table = []
-    for idx, r in enumerate(results):
-        pred_class = r.get("predicted_class")
-        prob = r.get("probability")
-        label = "Likely Exploited" if pred_class == 1 else "Not Exploited"
-        risk = "High" if (pred_class == 1 and prob is not None and prob >= risk_threshold) else "Low"
-        if prob is None:
-            score_label = None
-        elif pred_class == 1:
-            score_label = f"Confidence (Exploited): {prob * 100:.1f}%"
-        else:
-            score_label = f"Confidence (Not Exploited): {prob * 100:.1f}%"
-        table.append(
-            {
-                "#": idx + 1,
-                "label": label,
-                "probability": score_label,
-                "risk_flag": risk,
-            }
+    Equivalent to preprocessor.transform on a one-row DataFrame (median/mode imputation,
+    one-hot with unknown categories ignored) without the pandas/sklearn round-trip.
+    """
+    if encoding_index["length"] != EXPECTED_VECTOR_LENGTH:
+        raise ValueError(
+            f"Encoded vector length {encoding_index['length']} != {EXPECTED_VECTOR_LENGTH}"
         )
+    vec = np.zeros(EXPECTED_VECTOR_LENGTH)
+    for col, (offset, fill) in encoding_index["numeric"].items():
+        value = numeric_inputs.get(col)
+        vec[offset] = fill if value is None else value
+    for col, (offsets, fill) in encoding_index["categorical"].items():
+        offset = offsets.get(str(cat_inputs.get(col, fill)))
+        if offset is not None:
+            vec[offset] = 1.0
+    return vec.tolist()
+
+
+@st.cache_data(show_spinner=False)
+def build_vector_cached(
+    numeric_items: Tuple[Tuple[str, float], ...],
+    cat_items: Tuple[Tuple[str, str], ...],
+) -> List[float]:
+    """Memoized build_vector_from_form keyed on hashable (name, value) tuples."""
+    return build_vector_from_form(load_encoding_index(), dict(numeric_items), dict(cat_items))
 
+
+def render_results(results: List[Dict[str, Any]], risk_threshold: float):
+    # Column arrays instead of per-row dicts; missing probabilities become NaN
+    probs = np.array([r.get("probability") for r in results], dtype=float)
+    classes = np.array([r.get("predicted_class") for r in results], dtype=float)
+    items = np.arange(1, len(results) + 1)
+    exploited = classes == 1
+    has_prob = ~np.isnan(probs)
+    high_risk = exploited & (probs >= risk_threshold)
+
+    labels = np.where(exploited, "Likely Exploited", "Not Exploited")
+    risks = np.where(high_risk, "High", "Low")
+    score_text = np.char.add(
+        np.where(exploited, "Confidence (Exploited): ", "Confidence (Not Exploited): "),
+        np.char.mod("%.1f%%", probs * 100),
+    )
+    score_labels = np.where(has_prob, score_text.astype(object), None)
+
+    table = pd.DataFrame(
+        {"#": items, "label": labels, "probability": score_labels, "risk_flag": risks}
+    )
     st.dataframe(table, use_container_width=True, hide_index=True)
 
-    for idx, r in enumerate(results):
-        prob = r.get("probability")
-        pred_class = r.get("predicted_class")
-        if prob is None:
-            continue
-        color = "red" if (pred_class == 1 and prob >= risk_threshold) else "green"
-        score_text = (
-            f"Confidence (Exploited): {prob*100:.1f}%"
-            if pred_class == 1
-            else f"Confidence (Not Exploited): {prob*100:.1f}%"
-        )
-        st.markdown(
-            f"<div style='padding:8px;margin:4px 0;border:1px solid #333;border-radius:6px;"
-            f"background:#111;'>Item {idx+1}: "
-            f"<span style='color:{color};font-weight:600;'>{score_text}</span>"
-            f"</div>",
-            unsafe_allow_html=True,
-        )
+    # All badges in one markdown block rather than one Streamlit element per item
+    colors = np.where(high_risk, "red", "green")
+    badges = "".join(
+        f"<div style='padding:8px;margin:4px 0;border:1px solid #333;border-radius:6px;"
+        f"background:#111;'>Item {idx}: "
+        f"<span style='color:{color};font-weight:600;'>{text}</span>"
+        f"</div>"
+        for idx, color, text in zip(items[has_prob], colors[has_prob], score_text[has_prob])
+    )
+    if badges:
+        st.markdown(badges, unsafe_allow_html=True)
 
 
 st.set_page_config(page_title="CVEye - Exploit Risk", page_icon="🛡️", layout="wide")
@@ -188,7 +246,7 @@ st.markdown(
 )
 
 if "payload_text" not in st.session_state:
-    st.session_state.payload_text = json.dumps(build_sample_payload(), indent=2)
+    st.session_state.payload_text = build_sample_payload_json()
 
 preprocessor, meta, cat_options = load_encoder()
 
@@ -239,7 +297,9 @@ else:
             "last_modified_date_age_days": modified_age,
         }
         try:
-            vector = build_vector_from_form(preprocessor, numeric_inputs, cat_inputs)
+            vector = build_vector_cached(
+                tuple(sorted(numeric_inputs.items())), tuple(sorted(cat_inputs.items()))
+            )
             payload = {"features": [vector for _ in range(int(form_batch))]}
 
             with st.spinner("Calling API..."):
@@ -270,7 +330,7 @@ with col1:
     batch_size = st.number_input("Sample batch size", min_value=1, max_value=5, value=2, step=1)
 with col2:
     if st.button("Generate sample payload"):
-        st.session_state.payload_text = json.dumps(build_sample_payload(int(batch_size)), indent=2)
+        st.session_state.payload_text = build_sample_payload_json(int(batch_size))
 
 if st.button("Send to /predict", type="primary"):
     if not api_url:
@@ -1,8 +1,9 @@
 from pathlib import Path
 import os
-import pickle
 import sys
 
+import joblib
+import numpy as np
 import scipy.sparse
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score
@@ -21,7 +22,7 @@ TRAINING_CFG = CONFIG.get("training", {})
 
 
 def _resolve_model_path(value: str) -> Path:
-    default_path = Path(MODELS_DIR) / "logistic_regression_model.pkl"
+    default_path = Path(MODELS_DIR) / "logistic_regression_model.joblib"
     if not value:
         return default_path
     candidate = Path(value)
@@ -44,8 +45,8 @@ wandb.init(
 # Load sparse splits
 X_train = scipy.sparse.load_npz(f"{TRAIN_TEST_DIR}/X_train.npz")
 X_test = scipy.sparse.load_npz(f"{TRAIN_TEST_DIR}/X_test.npz")
-y_train = scipy.sparse.load_npz(f"{TRAIN_TEST_DIR}/y_train.npz").toarray()
-y_test = scipy.sparse.load_npz(f"{TRAIN_TEST_DIR}/y_test.npz").toarray()
+y_train = np.load(f"{TRAIN_TEST_DIR}/y_train.npy")
+y_test = np.load(f"{TRAIN_TEST_DIR}/y_test.npy")
 
 # Train & log
 model = LogisticRegression()
@@ -70,10 +71,11 @@ wandb.log(
 # Save the trained model to disk
 model_file = _resolve_model_path(TRAINING_CFG.get("model_path", ""))
 api_file = Path(API_MODELS_DIR) / model_file.name
-with open(model_file, "wb") as file:
-    pickle.dump(model, file)
-with open(api_file, "wb") as file:
-    pickle.dump(model, file)
+# Uncompressed joblib with float32 weights so the API can memory-map them as-is
+model.coef_ = model.coef_.astype(np.float32)
+model.intercept_ = model.intercept_.astype(np.float32)
+joblib.dump(model, model_file, compress=0)
+joblib.dump(model, api_file, compress=0)
 LOGGER.info(f"Saved model to {api_file} and {model_file}")
 
 # Log artifacts to WandB
@@ -1,12 +1,23 @@
+import numpy as np
+import orjson
 import pandas as pd
 import aiohttp
 import asyncio
-import time
 from typing import List, Dict, Any, Callable, Optional, Union, Tuple
 import backoff
+from aiolimiter import AsyncLimiter
+from collections import deque
 from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from config import LOGGER
 
+# uvloop is optional; fall back to the default asyncio loop when it is not installed
+try:
+    import uvloop
+except ModuleNotFoundError:
+    uvloop = None
+
 
 @dataclass
 class APIResponse:
@@ -19,6 +30,83 @@ class APIResponse:
     status_code: Optional[int] = None
 
 
+# Handler-owned columns; status_code is nullable because timeouts carry no status
+RESULT_DTYPES = {"success": "bool", "status_code": "Int16", "error": "string[pyarrow]"}
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date form)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _check_concurrency_bounds(min_limit: int, max_limit: int) -> None:
+    """A limit below 1, or a floor above the ceiling, would leave acquire() waiting forever."""
+    if not 1 <= min_limit <= max_limit:
+        raise ValueError(
+            f"Concurrency bounds need 1 <= min <= max, got min={min_limit}, max={max_limit}"
+        )
+
+
+class AIMDConcurrency:
+    """
+    Adaptive in-flight request cap: additive increase while responses are fast and the
+    server reports headroom, multiplicative decrease on throttling or slow responses.
+    Starts at max_limit, so a healthy API gets full concurrency from the first request.
+    """
+
+    def __init__(
+        self,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        window: int = 20,
+        remaining_threshold: int = 1,
+    ):
+        _check_concurrency_bounds(min_limit, max_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.remaining_threshold = remaining_threshold
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(
+        self,
+        latency: Optional[float],
+        status: Optional[int],
+        remaining: Optional[int] = None,
+    ) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            if latency is not None:
+                self.latencies.append(latency)
+            throttled = status in (429, 502, 503)
+            if throttled or latency is None or latency > self.latency_target:
+                self.limit = max(self.min_limit, self.limit * 0.5)
+            elif sum(self.latencies) / len(self.latencies) < self.latency_target and (
+                remaining is None or remaining > self.remaining_threshold
+            ):
+                self.limit = min(self.max_limit, self.limit + 0.5)
+            self._cond.notify_all()
+
+
 class PublicAPIBatchProcessor:
     """
     Process large batches of public API calls efficiently with rate limiting and backoff handling.
@@ -31,24 +119,37 @@ class PublicAPIBatchProcessor:
         rate_limit_per_minute: int = 60,
         timeout: int = 30,
         retries: int = 3,
+        min_concurrent_requests: int = 1,
+        latency_target: float = 10.0,
+        burst: Optional[int] = None,
     ):
         """
         Initialize the batch processor.
 
         Args:
             base_url: Base URL for API calls
-            max_concurrent_requests: Maximum number of concurrent requests
+            max_concurrent_requests: Upper bound for the adaptive concurrency limit
             rate_limit_per_minute: Maximum requests per minute
             timeout: Timeout for each request in seconds
-            retries: Number of retries for failed requests
+            retries: Number of Retry-After waits honoured per request
+            min_concurrent_requests: Lower bound the concurrency limit backs off to
+            latency_target: Response time in seconds above which concurrency is halved
+            burst: Token bucket capacity; defaults to a full minute of requests
         """
+        _check_concurrency_bounds(min_concurrent_requests, max_concurrent_requests)
         self.base_url = base_url
         self.max_concurrent_requests = max_concurrent_requests
+        self.min_concurrent_requests = min_concurrent_requests
         self.rate_limit_per_minute = rate_limit_per_minute
+        self.latency_target = latency_target
+        self.burst = burst or rate_limit_per_minute
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.retries = retries
-        self.request_interval = 60 / rate_limit_per_minute
-        self.last_request_time = 0
+        # Concurrency and rate are enforced independently: the AIMD gate adapts the number
+        # of in-flight requests, the token bucket caps requests per minute across all batches.
+        # Both bind to the event loop, so they are created when _process_all starts
+        self.concurrency: Optional[AIMDConcurrency] = None
+        self.limiter: Optional[AsyncLimiter] = None
 
 
     @backoff.on_exception(
@@ -76,32 +177,47 @@ class PublicAPIBatchProcessor:
         Returns:
             Standardized API response
         """
+        loop = asyncio.get_running_loop()
         try:
-            # Apply rate limiting
-            current_time = time.time()
-            time_since_last_request = current_time - self.last_request_time
-            if time_since_last_request < self.request_interval:
-                await asyncio.sleep(self.request_interval - time_since_last_request)
-
-            self.last_request_time = time.time()
-
-            async with session.get(url, params=params, headers=headers) as response:
-                status = response.status
-
-                if status >= 200 and status < 300:
-                    data = await response.json()
-                    return APIResponse(
-                        success=True, data=data, query_params=params, status_code=status
-                    )
-                else:
-                    error_text = await response.text()
-                    return APIResponse(
-                        success=False,
-                        data=None,
-                        error=f"HTTP Error {status}: {error_text}",
-                        query_params=params,
-                        status_code=status,
-                    )
+            for attempt in range(self.retries + 1):
+                # Apply concurrency and rate limiting
+                await self.concurrency.acquire()
+                start = latency = status = remaining = retry_after = None
+                try:
+                    async with self.limiter:
+                        start = loop.time()
+                        async with session.get(url, params=params, headers=headers) as response:
+                            status = response.status
+                            remaining = response.headers.get("x-ratelimit-remaining")
+                            remaining = int(remaining) if remaining and remaining.isdigit() else None
+
+                            if status >= 200 and status < 300:
+                                # orjson parses the raw body directly, skipping aiohttp's charset sniffing
+                                data = orjson.loads(await response.read())
+                                return APIResponse(
+                                    success=True, data=data, query_params=params, status_code=status
+                                )
+
+                            error_text = await response.text()
+                            if status in (429, 503):
+                                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                            if retry_after is None or attempt == self.retries:
+                                return APIResponse(
+                                    success=False,
+                                    data=None,
+                                    error=f"HTTP Error {status}: {error_text}",
+                                    query_params=params,
+                                    status_code=status,
+                                )
+                finally:
+                    # Latency counts from admission by the token bucket, not from queueing
+                    if status is not None:
+                        latency = loop.time() - start
+                    await self.concurrency.release(latency, status, remaining)
+
+                # Throttled: wait as long as the server asked, outside the concurrency slot
+                LOGGER.warning(f"HTTP {status}, retrying in {retry_after:.1f}s (attempt {attempt + 1})")
+                await asyncio.sleep(retry_after)
 
         except asyncio.TimeoutError:
             return APIResponse(
@@ -166,6 +282,7 @@ class PublicAPIBatchProcessor:
 
     async def _process_batch(
         self,
+        session: aiohttp.ClientSession,
         param_values: List[Tuple[Any, ...]],
         endpoint: str,
         param_names: List[str],
@@ -176,6 +293,7 @@ class PublicAPIBatchProcessor:
         Process a batch of parameter values concurrently.
 
         Args:
+            session: aiohttp client session shared across batches
             param_values: List of parameter value tuples
             endpoint: API endpoint
             param_names: Names of the parameters to use in the API call
@@ -185,24 +303,72 @@ class PublicAPIBatchProcessor:
         Returns:
             List of API responses
         """
-        # Configure connection pool
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
-        timeout = aiohttp.ClientTimeout(total=self.timeout.total)
         try:
-            async with aiohttp.ClientSession(
-                connector=connector, timeout=timeout
-            ) as session:
-                # Fetch data for all parameter values in this batch
-                return await self.fetch_data(
-                    session,
-                    endpoint,
-                    param_values,
-                    param_names,
-                    additional_params,
-                    api_key,
-                )
+            # Fetch data for all parameter values in this batch
+            return await self.fetch_data(
+                session,
+                endpoint,
+                param_values,
+                param_names,
+                additional_params,
+                api_key,
+            )
         except Exception as e:
             LOGGER.error(f"Batch Processing Error: {e}")
+            return []
+
+    async def _process_all(
+        self,
+        param_values: List[Tuple[Any, ...]],
+        endpoint: str,
+        param_names: List[str],
+        batch_size: int,
+        additional_params: Optional[Dict[str, Any]] = None,
+        api_key: Optional[str] = None,
+    ) -> List[APIResponse]:
+        """
+        Process every batch on one event loop through a single client session.
+
+        Args:
+            param_values: List of parameter value tuples
+            endpoint: API endpoint
+            param_names: Names of the parameters to use in the API call
+            batch_size: Size of each batch
+            additional_params: Additional query parameters
+            api_key: Optional API key
+
+        Returns:
+            List of API responses for all batches
+        """
+        self.concurrency = AIMDConcurrency(
+            self.min_concurrent_requests, self.max_concurrent_requests, self.latency_target
+        )
+        # Token bucket holding `burst` tokens, refilled at rate_limit_per_minute
+        self.limiter = AsyncLimiter(self.burst, 60 * self.burst / self.rate_limit_per_minute)
+
+        # One connection pool for the whole run keeps DNS + TLS warm across batches
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent_requests, ttl_dns_cache=300, keepalive_timeout=60
+        )
+        total_items = len(param_values)
+        all_results = []
+
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            # Create batches and process them
+            for i in range(0, total_items, batch_size):
+                batch_values = param_values[i : i + batch_size]
+                LOGGER.info(
+                    f"Processing batch {i//batch_size + 1}/{(total_items-1)//batch_size + 1} "
+                    f"({len(batch_values)} items)"
+                )
+                # No pause between batches: the limiter already spaces requests
+                all_results.extend(
+                    await self._process_batch(
+                        session, batch_values, endpoint, param_names, additional_params, api_key
+                    )
+                )
+
+        return all_results
 
     def process_dataframe(
         self,
@@ -245,30 +411,25 @@ class PublicAPIBatchProcessor:
         # Calculate optimal batch size based on rate limits and concurrency
         optimal_batch_size = min(batch_size, self.max_concurrent_requests * 2)
 
-        # Process in batches
-        all_results = []
-
-        # Create batches and process them
-        for i in range(0, total_items, optimal_batch_size):
-            batch_values = param_values[i : i + optimal_batch_size]
-            LOGGER.info(
-                f"Processing batch {i//optimal_batch_size + 1}/{(total_items-1)//optimal_batch_size + 1} "
-                f"({len(batch_values)} items)"
-            )
+        # Process all batches on a single event loop. uvloop (when available) runs on a
+        # loop owned by this call, leaving the process-wide event loop policy untouched
+        coro = self._process_all(
+            param_values,
+            endpoint,
+            param_names,
+            optimal_batch_size,
+            additional_params,
+            api_key,
+        )
+        if uvloop is not None:
+            loop = uvloop.new_event_loop()
             try:
-                # Run batch processing using asyncio
-                batch_results = asyncio.run(
-                    self._process_batch(
-                        batch_values, endpoint, param_names, additional_params, api_key
-                    )
-                )
-
-                all_results.extend(batch_results)
-            except Exception as e:
-                LOGGER.error(f"Batch Processing Error: {e}")
-            # Add a small delay between batches to avoid API rate limits
-            if i + optimal_batch_size < total_items:
-                time.sleep(1)
+                all_results = loop.run_until_complete(coro)
+            finally:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.close()
+        else:
+            all_results = asyncio.run(coro)
 
         # Process results into a DataFrame
         if result_handler:
@@ -290,36 +451,43 @@ class PublicAPIBatchProcessor:
         Returns:
             DataFrame with processed results
         """
-        processed_data = []
+        # Columnar fill: one preallocated list per column, written by row index, so pandas
+        # infers each column's dtype once instead of walking a list of row dicts
+        n_rows = len(results)
+        columns: Dict[str, List[Any]] = {}
 
-        for response in results:
-            result_dict = {}
+        def put(key: str, idx: int, value: Any) -> None:
+            if key not in columns:
+                columns[key] = [np.nan] * n_rows
+            columns[key][idx] = value
 
+        for idx, response in enumerate(results):
             # Add query parameters
             if response.query_params:
                 for name in param_names:
                     if name in response.query_params:
-                        result_dict[f"query_{name}"] = response.query_params[name]
+                        put(f"query_{name}", idx, response.query_params[name])
 
             # Add status information
-            result_dict["success"] = response.success
-            result_dict["status_code"] = response.status_code
+            put("success", idx, response.success)
+            put("status_code", idx, response.status_code)
 
             if response.success:
-                # If response data is a dict, flatten top-level keys
+                # If response data is a dict, flatten top-level keys; nested
+                # objects/arrays are stored as is
                 if isinstance(response.data, dict):
                     for key, value in response.data.items():
-                        # Don't include nested objects/arrays as separate columns
-                        if not isinstance(value, (dict, list)):
-                            result_dict[key] = value
-                        else:
-                            # Store complex data as is
-                            result_dict[key] = value
+                        # A payload key shadowing a handler column is kept under data_<key>
+                        if key in RESULT_DTYPES or key == "data" or key.startswith("query_"):
+                            key = f"data_{key}"
+                        put(key, idx, value)
                 else:
-                    result_dict["data"] = response.data
+                    put("data", idx, response.data)
             else:
-                result_dict["error"] = response.error
-
-            processed_data.append(result_dict)
+                put("error", idx, response.error)
 
-        return pd.DataFrame(processed_data)
+        # Handler-owned columns get declared dtypes; payload keys never share their names
+        # (see above) and are still inferred
+        return pd.DataFrame(
+            {key: pd.Series(values, dtype=RESULT_DTYPES.get(key)) for key, values in columns.items()}
+        )
@@ -1,6 +1,6 @@
 from google.cloud import bigquery
 import os
-import csv, json
+import pyarrow.parquet as pq
 import gc 
 # from tqdm.auto import tqdm
 from config import MERGED_DATA_DIR, LOGGER
@@ -35,11 +35,10 @@ def send_to_bigQuery(data_rows):
 # Example usage
 if __name__ == "__main__":
     # data = []
-    csv_file_path = (f"{MERGED_DATA_DIR}/Main1.csv")
-    LOGGER.info(f"Loading {csv_file_path}")
-    with open(csv_file_path, mode='r', newline='', encoding='utf-8') as csvfile:
-        # Use DictReader to read CSV rows as dictionaries
-        data = list(csv.DictReader(csvfile))
+    parquet_file_path = (f"{MERGED_DATA_DIR}/Main1.parquet")
+    LOGGER.info(f"Loading {parquet_file_path}")
+    # Rows as dictionaries of native Python values (nulls become None, which JSON accepts)
+    data = pq.read_table(parquet_file_path).to_pylist()
     
     send_to_bigQuery(data)
     del data
@@ -1,16 +1,26 @@
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
 from loguru import logger
 import sys
 
+
+@lru_cache(maxsize=1)
+def load_env() -> bool:
+    """Parse .env once per process; later callers get the cached result."""
+    return load_dotenv()
+
+
 # Load environment variables from .env file if it exists
-load_dotenv()
+load_env()
+
 
 def init_logger(log_dir: Path = Path("logs")):
     log_dir.mkdir(parents=True, exist_ok=True)
     logger.remove()
 
+    # enqueue hands records to loguru's writer thread, keeping stderr writes off the caller
     logger.add(
         sys.stderr,
         format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
@@ -18,13 +28,18 @@ def init_logger(log_dir: Path = Path("logs")):
                "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
                "<level>{message}</level>",
         level="INFO",
+        enqueue=True,
     )
 
+    # enqueue batches records through a queue (safe across worker processes);
+    # buffering is passed to open() for a 64 KB file buffer
     logger.add(
         log_dir / "pipeline.log",
         rotation="10 MB",
         retention="30 days",
         encoding="utf-8",
+        enqueue=True,
+        buffering=1 << 16,
     )
 
     return logger
@@ -56,11 +71,13 @@ API_MODELS_DIR = PROJ_ROOT / "project" / "app"/ "models"
 REPORTS_DIR = PROJ_ROOT / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
 
-# If tqdm is installed, configure loguru with tqdm.write
+# If tqdm is installed and we are on a terminal, configure loguru with tqdm.write
 # https://github.com/Delgan/loguru/issues/135
-try:
-    from tqdm import tqdm
-
-    LOGGER.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
-except ModuleNotFoundError:
-    pass
+# (non-interactive runs skip it: tqdm.write flushes on every record)
+if sys.stderr.isatty():
+    try:
+        from tqdm import tqdm
+
+        LOGGER.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
+    except ModuleNotFoundError:
+        pass
@@ -1,18 +1,17 @@
 from pathlib import Path
+import numpy as np
+import orjson
 import pandas as pd
 import typer
 from batch import PublicAPIBatchProcessor
-from dotenv import load_dotenv
 import os
-from config import RAW_DATA_DIR, LOGGER, PROJ_ROOT
-from datetime import date
-import calendar
+from config import RAW_DATA_DIR, LOGGER, PROJ_ROOT, load_env
 
 from project.config_loader import get_config
 
 
 app = typer.Typer()
-load_dotenv()
+load_env()
 
 CONFIG = get_config()
 DATA_CFG = CONFIG.get("data", {})
@@ -28,22 +27,24 @@ def _resolve_path(path_value: str, fallback: Path) -> Path:
     return path
 
 
-def get_Dates(start_year, end_year):
-    params = []
-    for year in range(start_year, end_year + 1):
-        # Create the four quarters for each year
-        for month in range(1, 13):
-            for i in range(0, 6000, 2000):
-                _, last_date = calendar.monthrange(year, month)
-                start_date = date(year, month, 1)
-                end_date = date(year, month, last_date)
-                dict = {
-                    "pubStartDate": f"{year}-{start_date.strftime('%m')}-01T00:00:00.000",
-                    "pubEndDate": f"{year}-{end_date.strftime('%m')}-{last_date}T23:59:59.999",
-                    "startIndex": i,
-                }
-                params.append(dict)
-    return params
+def get_Dates(start_year, end_year) -> pd.DataFrame:
+    """
+    Build one query row per (month, startIndex page) in [start_year, end_year].
+
+    Vectorized over a DatetimeIndex of month starts instead of looping per month.
+    """
+    months = pd.date_range(f"{start_year}-01-01", f"{end_year}-12-01", freq="MS")
+    month_ends = months + pd.offsets.MonthEnd(0)
+    start_indices = [0, 2000, 4000]
+    n_pages = len(start_indices)
+
+    return pd.DataFrame(
+        {
+            "pubStartDate": np.repeat(months.strftime("%Y-%m-01T00:00:00.000"), n_pages),
+            "pubEndDate": np.repeat(month_ends.strftime("%Y-%m-%dT23:59:59.999"), n_pages),
+            "startIndex": np.tile(start_indices, len(months)),
+        }
+    )
 
 
 @app.command()
@@ -55,18 +56,31 @@ def main(
     end_year: int = typer.Option(INGEST_CFG.get("end_year", 2024), help="Last year to pull CVEs for."),
     batch_size: int = typer.Option(INGEST_CFG.get("batch_size", 10), help="Number of parameter rows per API call."),
     max_concurrent_requests: int = typer.Option(
-        INGEST_CFG.get("max_concurrent_requests", 10), help="Concurrent requests allowed by the API."
+        INGEST_CFG.get("max_concurrent_requests", 10), min=1,
+        help="Concurrent requests allowed by the API; adaptive concurrency starts here."
+    ),
+    min_concurrent_requests: int = typer.Option(
+        INGEST_CFG.get("min_concurrent_requests", 1), min=1, help="Floor adaptive concurrency backs off to."
+    ),
+    latency_target: float = typer.Option(
+        INGEST_CFG.get("latency_target_seconds", 10.0), help="Response time in seconds that triggers backing off."
     ),
     rate_limit_per_minute: int = typer.Option(
         INGEST_CFG.get("rate_limit_per_minute", 120), help="Maximum calls per minute."
     ),
+    burst: int = typer.Option(INGEST_CFG.get("burst", 10), help="Calls allowed back to back before rate limiting."),
     # ----------------------------------------------
 ):
 
+    if min_concurrent_requests > max_concurrent_requests:
+        raise typer.BadParameter(
+            f"--min-concurrent-requests ({min_concurrent_requests}) exceeds "
+            f"--max-concurrent-requests ({max_concurrent_requests})"
+        )
+
     api_key = os.getenv("NVD_API_KEY")
 
-    params = get_Dates(start_year, end_year)
-    dates = pd.DataFrame(params)
+    dates = get_Dates(start_year, end_year)
     mcr, rate_lim = max_concurrent_requests, rate_limit_per_minute
     LOGGER.info(
         f"Ingesting at {mcr} max concurrent requests per minute and at Rate Limit of {rate_lim} per minute."
@@ -77,6 +91,9 @@ def main(
         base_url="https://services.nvd.nist.gov/rest/json/cves/2.0/",
         max_concurrent_requests=mcr,
         rate_limit_per_minute=rate_lim,  # Be respectful of public APIs
+        min_concurrent_requests=min_concurrent_requests,
+        latency_target=latency_target,
+        burst=burst,
     )
 
     LOGGER.info(f"Processing DataFrame")
@@ -89,7 +106,13 @@ def main(
         batch_size=batch_size,
         api_key=api_key,
     )
-    nvd.to_csv(output_path)
+    # Store the CVE lists as JSON (not Python repr) so process_cve can parse them natively
+    if "vulnerabilities" in nvd:
+        nvd["vulnerabilities"] = [
+            orjson.dumps(v).decode() if isinstance(v, list) else v for v in nvd["vulnerabilities"]
+        ]
+    # The positional index carries nothing; process only reads the vulnerabilities column
+    nvd.to_csv(output_path, index=False)
 
 
 if __name__ == "__main__":
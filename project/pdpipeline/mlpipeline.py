@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
 import joblib
+import numpy as np
 import scipy.sparse
 import pandas as pd
 import typer
@@ -8,7 +10,7 @@ import typer
 from google.cloud import bigquery
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedShuffleSplit
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder
 
@@ -40,15 +42,20 @@ def clean_ml(df: pd.DataFrame):
     return processed train/test matrices + the preprocessor.
     """
 
-    #  datetime aging 
+    #  datetime aging: one reference time for every column, assigned in a single pass
+    now = pd.Timestamp.now(tz="UTC")
+    aged = {}
     for col in ["published_date", "last_modified_date"]:
         if col in df:
-            df[col] = pd.to_datetime(df[col], utc=True)
-            now = pd.Timestamp.now(tz="UTC")
-            df[col + "_age_days"] = (now - df[col]).dt.days
+            ts = pd.to_datetime(df[col], utc=True, cache=True)
+            age = (now - ts).dt.days
+            aged[col] = ts
+            # day counts fit int32; keep float only when NaT leaves gaps for the imputer
+            aged[col + "_age_days"] = age if age.hasnans else age.astype(np.int32)
+    df = df.assign(**aged)
 
-    # y targets 
-    y = df["exploited"].astype(int)
+    # y targets: dense 1D 0/1 labels
+    y = df["exploited"].astype(np.int8).to_numpy()
 
     # numeric 
     numeric_cols = [
@@ -66,17 +73,22 @@ def clean_ml(df: pd.DataFrame):
     ]
     cat_cols = [c for c in cat_cols if c in df]
 
-    X = df[numeric_cols + cat_cols]
+    # category dtype keeps this feature frame small (integer codes, one copy of each string),
+    # and its categories are handed to the encoder so fit skips re-deriving them per column
+    X = df[numeric_cols + cat_cols].astype({c: "category" for c in cat_cols})
+    categories = [X[c].cat.categories.to_numpy(dtype=object) for c in cat_cols]
 
     #  preprocessing 
     numeric_transformer = Pipeline(
-        steps=[("imputer", SimpleImputer(strategy="median"))]
+        steps=[("imputer", SimpleImputer(strategy="median", copy=False))]
     )
 
     categorical_transformer = Pipeline(
         steps=[
             ("imputer", SimpleImputer(strategy="most_frequent")),
-            ("onehot", OneHotEncoder(handle_unknown="ignore"))
+            ("onehot", OneHotEncoder(
+                categories=categories, handle_unknown="ignore", dtype=np.float32
+            ))
         ]
     )
 
@@ -87,35 +99,41 @@ def clean_ml(df: pd.DataFrame):
         ]
     )
 
-    # Fit-transform
-    X_proc = preprocessor.fit_transform(X)
+    # Fit-transform; ColumnTransformer returns dense output when the one-hot block is dense
+    # enough, so force CSR to keep the X_* splits in the .npz format LRmodel loads
+    X_proc = scipy.sparse.csr_matrix(preprocessor.fit_transform(X), dtype=np.float32)
 
-    # y sparse
-    y_sparse = scipy.sparse.csr_matrix(y.values.reshape(-1, 1))
-
-    # Train/test split
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_proc,
-        y_sparse,
-        test_size=0.2,
-        stratify=y_sparse.toarray(),
-        random_state=42,
-    )
+    # Train/test split: stratified indices from the 1D labels, then row-index the CSR matrix
+    sss = StratifiedShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    (train_idx, test_idx), = sss.split(np.zeros(len(y)), y)
+    X_train, X_test = X_proc[train_idx], X_proc[test_idx]
+    y_train, y_test = y[train_idx], y[test_idx]
 
     return X_train, X_test, y_train, y_test, preprocessor, numeric_cols, cat_cols
 
 # utils to save data and processors
 def save_sparse_matrix(path: Path, matrix):
-    scipy.sparse.save_npz(str(path), matrix)
+    """Write <name>.npz uncompressed; zlib gains little on CSR buffers."""
+    scipy.sparse.save_npz(str(path), matrix.tocsr(), compressed=False)
+
+
+def save_split(output_dir: Path, name: str, matrix):
+    """Feature splits (X_*) go to <name>.npz, label splits (y_*) to <name>.npy."""
+    if name.startswith("X_"):
+        save_sparse_matrix(output_dir / f"{name}.npz", scipy.sparse.csr_matrix(matrix))
+    else:
+        np.save(output_dir / f"{name}.npy", matrix)
 
 
 def save_splits(output_dir: Path, X_train, X_test, y_train, y_test):
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    save_sparse_matrix(output_dir / "X_train.npz", X_train)
-    save_sparse_matrix(output_dir / "X_test.npz", X_test)
-    save_sparse_matrix(output_dir / "y_train.npz", y_train)
-    save_sparse_matrix(output_dir / "y_test.npz", y_test)
+    # Each split is independent file I/O (NumPy writes release the GIL), so write them concurrently
+    splits = {"X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test}
+    with ThreadPoolExecutor(max_workers=len(splits)) as ex:
+        futures = [ex.submit(save_split, output_dir, name, matrix) for name, matrix in splits.items()]
+        for future in futures:
+            future.result()
 
 
 def save_metadata(output_dir: Path, preprocessor, numeric_cols, cat_cols):
@@ -126,14 +144,25 @@ def save_metadata(output_dir: Path, preprocessor, numeric_cols, cat_cols):
         # Fallback: no feature names available; keep going
         feature_names = []
 
-    joblib.dump(preprocessor, output_dir / "preprocessor.joblib")
+    categories = {}
+    try:
+        onehot = preprocessor.named_transformers_["cat"].named_steps["onehot"]
+        categories = {col: cats.tolist() for col, cats in zip(cat_cols, onehot.categories_)}
+    except Exception:
+        categories = {}
+
+    # Uncompressed so fitted arrays can be memory-mapped on load; protocol 5 for out-of-band buffers
+    joblib.dump(preprocessor, output_dir / "preprocessor.joblib", compress=0, protocol=5)
     joblib.dump(
         {
             "numeric_cols": numeric_cols,
             "cat_cols": cat_cols,
             "onehot_features": feature_names,
+            "categories": categories,
         },
         output_dir / "feature_metadata.joblib",
+        compress=0,
+        protocol=5,
     )
 
 
@@ -1,12 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 
 import typer
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from pyarrow import csv as pacsv
 import os
 import gc
 
 from config import (
-    PROCESSED_DATA_DIR,
     RAW_DATA_DIR,
     MERGED_DATA_DIR,
     EXTERNAL_DATA_DIR,
@@ -14,7 +21,7 @@ from config import (
     LOGGER,
     PROJ_ROOT,
 )
-from process_cve import process_cve_batches, merge_batch_results
+from process_cve import process_cve_batches, SCHEMAS
 
 from project.config_loader import get_config
 
@@ -24,6 +31,31 @@ CONFIG = get_config()
 DATA_CFG = CONFIG.get("data", {})
 
 
+# cvss_v3 columns kept in Main1 (version and vector_string are never used downstream)
+CVSS_V3_COLUMNS = [
+    "cve_id", "source", "type", "base_score", "base_severity", "attack_vector",
+    "attack_complexity", "privileges_required", "user_interaction", "scope",
+    "confidentiality_impact", "integrity_impact", "availability_impact",
+    "exploitability_score", "impact_score",
+]
+
+REQUIRED_COLUMNS = [
+    "exploited", "base_score", "exploitability_score", "impact_score", "attack_vector", "cwe_id",
+]
+
+
+@contextmanager
+def gc_disabled():
+    """Pause the cyclic collector; refcounting still frees temporaries as they drop."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
 def _resolve_path(path_value: str, fallback: Path) -> Path:
     if not path_value:
         return fallback
@@ -35,63 +67,104 @@ def _resolve_path(path_value: str, fallback: Path) -> Path:
 @app.command()
 def main(
     input_path: Path = _resolve_path(DATA_CFG.get("raw_output", ""), RAW_DATA_DIR / "CVE2024.csv"),
-    process_path: Path = _resolve_path(DATA_CFG.get("processed_dir", ""), PROCESSED_DATA_DIR),
     output_path: Path = _resolve_path(DATA_CFG.get("merged_dir", ""), MERGED_DATA_DIR),
+    legacy_csv: bool = typer.Option(False, "--legacy-csv", help="Also write Main1.csv for manual inspection."),
 ):
 
     
-    # Read input path
-    df = pd.read_csv(input_path)
-    process_cve_batches(
-        df=df,
-        column_name="vulnerabilities",
-        batch_size=1000,
-        output_path=process_path,
-        n_workers=4,
-        incremental_save=True,
+    # Read input path; process_cve_batches only consumes the vulnerabilities column
+    table = pacsv.read_csv(
+        input_path,
+        read_options=pacsv.ReadOptions(block_size=1 << 24),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(include_columns=["vulnerabilities"]),
     )
-    LOGGER.info(f"Processed {len(df)} cve batches")
-    merge_batch_results(process_path, output_path)
-    LOGGER.info(f"Merged Batch Results to {output_path}")
+    # One Parquet file per group, appended batch by batch as workers finish.
+    # zstd: the text-heavy groups (descriptions, references, CPE criteria) compress well
+    output_path.mkdir(parents=True, exist_ok=True)
+    local_fs = pafs.LocalFileSystem()
+    with ExitStack() as stack:
+
+        def open_writer(name, schema):
+            # 8 MiB Arrow-side buffer turns each batch's row-group pages into a few large writes
+            sink = stack.enter_context(
+                local_fs.open_output_stream(
+                    str(output_path / f"{name}.parquet"), compression=None, buffer_size=8 << 20
+                )
+            )
+            return stack.enter_context(pq.ParquetWriter(sink, schema, compression="zstd"))
+
+        writers = {name: open_writer(name, schema) for name, schema in SCHEMAS.items()}
+        n_cves = process_cve_batches(
+            table=table,
+            column_name="vulnerabilities",
+            pages_per_task=1,
+            writers=writers,
+            n_workers=4,
+        )
+    LOGGER.info(f"Wrote {n_cves} CVEs from {table.num_rows} responses to {output_path}")
     LOGGER.info(f"Cleaning Feature Datasets")
 
     # Merge feature datasets
     kev_path = _resolve_path(
         DATA_CFG.get("kev_csv", ""), EXTERNAL_DATA_DIR / "known_exploited_vulnerabilities.csv"
     )
-    kev = pd.read_csv(kev_path)
-    main = pd.read_csv(f"{MERGED_DATA_DIR}/main_combined1.csv")
-
-
-    main["exploited"] = main["cve_id"].isin(kev["cveID"]).astype(int)
-    affected= pd.read_csv(f"{MERGED_DATA_DIR}/affected_products_combined1.csv")
-
-    main = pd.merge(main, affected, on="cve_id", how= 'left')
-    del affected 
-    gc.collect()
-
-    cvss_v3= pd.read_csv(f"{MERGED_DATA_DIR}/cvss_v3_combined1.csv")
-    main = pd.merge(main, cvss_v3, on="cve_id", how= 'left')
-    del cvss_v3
-    gc.collect()
-
-    weakness= pd.read_csv(f"{MERGED_DATA_DIR}/weaknesses_combined1.csv", usecols=["cve_id","type", "cwe_id"])
-    main = pd.merge(main, weakness, on="cve_id", how= 'left')
-    del weakness 
-    gc.collect()
-
-    main1=f"{MERGED_DATA_DIR}/Main1.csv"
-    # Save to Main1.csv
-    drop_cols = ["Unnamed: 0", "Unnamed: 0_x","Unnamed: 0_y","type_y",'version_end_including', 'criteria', 'match_criteria_id','version','vector_string']
-    main.drop(drop_cols, axis=1, inplace=True)
-    main.dropna(inplace=True)
-    main.to_csv(main1, index=False)
+    # Independent reads overlap on a thread pool (Arrow and the CSV parser release the GIL)
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        # Futures are popped as they are consumed so each frame is freed right after its merge
+        futures = {
+            "kev": ex.submit(
+                pd.read_csv, kev_path, usecols=["cveID"], dtype={"cveID": "string"}, engine="pyarrow"
+            ),
+            "main": ex.submit(pd.read_parquet, output_path / "main.parquet"),
+            # Column projection: only load what survives the final drop
+            "affected": ex.submit(
+                pd.read_parquet,
+                output_path / "affected_products.parquet",
+                columns=["cve_id", "vulnerable"],
+            ),
+            "cvss_v3": ex.submit(
+                pd.read_parquet,
+                output_path / "cvss_v3.parquet",
+                columns=CVSS_V3_COLUMNS,
+            ),
+            "weakness": ex.submit(
+                pd.read_parquet,
+                output_path / "weaknesses.parquet",
+                columns=["cve_id", "cwe_id"],
+            ),
+        }
+        kev, main = futures.pop("kev").result(), futures.pop("main").result()
+
+        # Arrow's hash-set membership over contiguous UTF-8 buffers; 0/1 label fits in int8
+        is_kev = pc.is_in(
+            pa.Array.from_pandas(main["cve_id"], type=pa.string()),
+            value_set=pa.Array.from_pandas(kev["cveID"], type=pa.string()),
+        )
+        main["exploited"] = is_kev.to_numpy(zero_copy_only=False).astype(np.int8)
+
+        del kev, is_kev
+
+        # No cyclic GC passes over the large frames mid-merge
+        with gc_disabled():
+            main = main.merge(futures.pop("affected").result(), on="cve_id", how="left")
+            # weaknesses.type is no longer read, so name the CVSS one as the old merge suffix did
+            main = main.merge(
+                futures.pop("cvss_v3").result().rename(columns={"type": "type_x"}),
+                on="cve_id",
+                how="left",
+            )
+            main = main.merge(futures.pop("weakness").result(), on="cve_id", how="left")
+
+    main1=f"{MERGED_DATA_DIR}/Main1.parquet"
+    # Save to Main1.parquet
+    # Only rows missing the label or core CVSS/CWE features are unusable; clean_ml imputes the rest
+    main = main.dropna(subset=REQUIRED_COLUMNS).reset_index(drop=True)
+    main.to_parquet(main1, engine="pyarrow", compression="snappy", index=False)
+    if legacy_csv:
+        main.to_csv(f"{MERGED_DATA_DIR}/Main1.csv", index=False)
     LOGGER.info(f"Saved main features to {main1}")
 
-    del main
-    del kev
-    gc.collect()
-
 
 if __name__ == "__main__":
     app()
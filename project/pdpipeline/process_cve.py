@@ -1,339 +1,402 @@
-import pandas as pd
-from typing import Dict, Any
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+from typing import Dict, Any, List
 from tqdm import tqdm
-import os
 import ast
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import functools
 import itertools
-from config import PROCESSED_DATA_DIR, LOGGER
+import multiprocessing
+import os
+import tempfile
+from config import LOGGER
 import gc
 
 
-def process_cve_data(cve_data: Dict[str, Any]) -> None:
-    cve_entry = cve_data.get("cve", {})
+# Low-cardinality text (CVSS enums, sources, languages, CWE ids) is dictionary-encoded:
+# int32 codes in memory and on disk, read back by pandas as categoricals
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+CVSS_V3_ENUMS = (
+    "source", "type", "version", "base_severity", "attack_vector", "attack_complexity",
+    "privileges_required", "user_interaction", "scope", "confidentiality_impact",
+    "integrity_impact", "availability_impact",
+)
+CVSS_V2_ENUMS = (
+    "source", "type", "version", "base_severity", "access_vector", "access_complexity",
+    "authentication", "confidentiality_impact", "integrity_impact", "availability_impact",
+)
+
+
+def _string_schema(*names, categories=(), **typed):
+    """All-string schema in column order, with categorical and other typed columns overridden."""
+    typed.update({name: CATEGORY for name in categories})
+    return pa.schema([(name, typed.get(name, pa.string())) for name in names])
+
+
+# Explicit schemas so every batch writes the same Parquet layout, even when a column
+# is entirely null within one batch
+SCHEMAS = {
+    "main": _string_schema(
+        "cve_id", "source_identifier", "published_date", "last_modified_date", "vuln_status",
+        categories=("source_identifier", "vuln_status"),
+    ),
+    "descriptions": _string_schema("cve_id", "lang", "description", categories=("lang",)),
+    "cvss_v3": _string_schema(
+        "cve_id", "source", "type", "version", "vector_string", "base_score",
+        "base_severity", "attack_vector", "attack_complexity", "privileges_required",
+        "user_interaction", "scope", "confidentiality_impact", "integrity_impact",
+        "availability_impact", "exploitability_score", "impact_score",
+        categories=CVSS_V3_ENUMS,
+        base_score=pa.float64(), exploitability_score=pa.float64(), impact_score=pa.float64(),
+    ),
+    "cvss_v2": _string_schema(
+        "cve_id", "source", "type", "version", "vector_string", "base_score",
+        "base_severity", "access_vector", "access_complexity", "authentication",
+        "confidentiality_impact", "integrity_impact", "availability_impact",
+        "exploitability_score", "impact_score", "ac_insuf_info", "obtain_all_privilege",
+        "obtain_user_privilege", "obtain_other_privilege", "user_interaction_required",
+        categories=CVSS_V2_ENUMS,
+        base_score=pa.float64(), exploitability_score=pa.float64(), impact_score=pa.float64(),
+        ac_insuf_info=pa.bool_(), obtain_all_privilege=pa.bool_(),
+        obtain_user_privilege=pa.bool_(), obtain_other_privilege=pa.bool_(),
+        user_interaction_required=pa.bool_(),
+    ),
+    "weaknesses": _string_schema(
+        "cve_id", "source", "type", "lang", "cwe_id",
+        categories=("source", "type", "lang", "cwe_id"),
+    ),
+    "affected_products": _string_schema(
+        "cve_id", "vulnerable", "criteria", "version_end_including", "match_criteria_id",
+        vulnerable=pa.bool_(),
+    ),
+    "references": _string_schema("cve_id", "url", "source", "tags", categories=("source",)),
+}
+
+
+def _struct(**fields):
+    return pa.struct(list(fields.items()))
+
+
+_S, _F, _B = pa.string(), pa.float64(), pa.bool_()
+_CVSS_METRIC = dict(source=_S, type=_S, exploitabilityScore=_F, impactScore=_F)
+
+# The slice of an NVD 2.0 vulnerability record that the groups are built from. Parsing
+# against it keeps column types stable across pages and skips every other key
+NVD_RECORD = _struct(cve=_struct(
+    id=_S, sourceIdentifier=_S, published=_S, lastModified=_S, vulnStatus=_S,
+    descriptions=pa.list_(_struct(lang=_S, value=_S)),
+    metrics=_struct(
+        cvssMetricV31=pa.list_(_struct(**_CVSS_METRIC, cvssData=_struct(
+            version=_S, vectorString=_S, baseScore=_F, baseSeverity=_S, attackVector=_S,
+            attackComplexity=_S, privilegesRequired=_S, userInteraction=_S, scope=_S,
+            confidentialityImpact=_S, integrityImpact=_S, availabilityImpact=_S,
+        ))),
+        cvssMetricV2=pa.list_(_struct(
+            **_CVSS_METRIC, baseSeverity=_S, acInsufInfo=_B, obtainAllPrivilege=_B,
+            obtainUserPrivilege=_B, obtainOtherPrivilege=_B, userInteractionRequired=_B,
+            cvssData=_struct(
+                version=_S, vectorString=_S, baseScore=_F, accessVector=_S,
+                accessComplexity=_S, authentication=_S, confidentialityImpact=_S,
+                integrityImpact=_S, availabilityImpact=_S,
+            ),
+        )),
+    ),
+    weaknesses=pa.list_(_struct(
+        source=_S, type=_S, description=pa.list_(_struct(lang=_S, value=_S)),
+    )),
+    configurations=pa.list_(_struct(nodes=pa.list_(_struct(cpeMatch=pa.list_(_struct(
+        vulnerable=_B, criteria=_S, versionEndIncluding=_S, matchCriteriaId=_S,
+    )))))),
+    references=pa.list_(_struct(url=_S, source=_S, tags=pa.list_(_S))),
+))
+PAGE_SCHEMA = pa.schema([("v", pa.list_(NVD_RECORD))])
+
+
+def _explode(items, name, ids):
+    """Flatten list field `name` of a struct array; returns (children, parent cve_id per child)."""
+    lists = pc.struct_field(items, name)
+    return pc.list_flatten(lists), pc.take(ids, pc.list_parent_indices(lists))
+
+
+def shred_cves(records: pa.StructArray) -> Dict[str, Dict[str, pa.Array]]:
+    """Split NVD_RECORD structs into the columns of every group table, in SCHEMAS order."""
+    field = pc.struct_field
+    cves = field(records, "cve")
+    ids = field(cves, "id")
+    columns = {}
+
+    # 1. Main CVE row
+    columns["main"] = {
+        "cve_id": ids,
+        "source_identifier": field(cves, "sourceIdentifier"),
+        "published_date": field(cves, "published"),
+        "last_modified_date": field(cves, "lastModified"),
+        "vuln_status": field(cves, "vulnStatus"),
+    }
 
-    # 1. Main CVE DataFrame
+    # 2. Descriptions rows (for multiple languages)
+    desc, desc_ids = _explode(cves, "descriptions", ids)
+    columns["descriptions"] = {
+        "cve_id": desc_ids, "lang": field(desc, "lang"), "description": field(desc, "value"),
+    }
 
-    main_df = pd.DataFrame(
-        [
-            {
-                "cve_id": cve_entry.get("id"),
-                "source_identifier": cve_entry.get("sourceIdentifier"),
-                "published_date": cve_entry.get("published"),
-                "last_modified_date": cve_entry.get("lastModified"),
-                "vuln_status": cve_entry.get("vulnStatus"),
-            }
-        ]
-    )
+    metrics = field(cves, "metrics")
+
+    # 3. CVSS v3.1 Metrics rows
+    metric, metric_ids = _explode(metrics, "cvssMetricV31", ids)
+    cvss_data = field(metric, "cvssData")
+    columns["cvss_v3"] = {
+        "cve_id": metric_ids,
+        "source": field(metric, "source"),
+        "type": field(metric, "type"),
+        "version": field(cvss_data, "version"),
+        "vector_string": field(cvss_data, "vectorString"),
+        "base_score": field(cvss_data, "baseScore"),
+        "base_severity": field(cvss_data, "baseSeverity"),
+        "attack_vector": field(cvss_data, "attackVector"),
+        "attack_complexity": field(cvss_data, "attackComplexity"),
+        "privileges_required": field(cvss_data, "privilegesRequired"),
+        "user_interaction": field(cvss_data, "userInteraction"),
+        "scope": field(cvss_data, "scope"),
+        "confidentiality_impact": field(cvss_data, "confidentialityImpact"),
+        "integrity_impact": field(cvss_data, "integrityImpact"),
+        "availability_impact": field(cvss_data, "availabilityImpact"),
+        "exploitability_score": field(metric, "exploitabilityScore"),
+        "impact_score": field(metric, "impactScore"),
+    }
 
-    # 2. Descriptions DataFrame (for multiple languages)
-    descriptions = []
-    for desc in cve_entry.get("descriptions", []):
-        descriptions.append(
-            {
-                "cve_id": cve_entry.get("id"),
-                "lang": desc.get("lang"),
-                "description": desc.get("value"),
-            }
-        )
-    descriptions_df = pd.DataFrame(descriptions) if descriptions else pd.DataFrame()
-
-    # 3. CVSS v3.1 Metrics DataFrame
-    cvss_v3_metrics = []
-    for metric in cve_entry.get("metrics", {}).get("cvssMetricV31", []):
-        cvss_data = metric.get("cvssData", {})
-        cvss_v3_metrics.append(
-            {
-                "cve_id": cve_entry.get("id"),
-                "source": metric.get("source"),
-                "type": metric.get("type"),
-                "version": cvss_data.get("version"),
-                "vector_string": cvss_data.get("vectorString"),
-                "base_score": cvss_data.get("baseScore"),
-                "base_severity": cvss_data.get("baseSeverity"),
-                "attack_vector": cvss_data.get("attackVector"),
-                "attack_complexity": cvss_data.get("attackComplexity"),
-                "privileges_required": cvss_data.get("privilegesRequired"),
-                "user_interaction": cvss_data.get("userInteraction"),
-                "scope": cvss_data.get("scope"),
-                "confidentiality_impact": cvss_data.get("confidentialityImpact"),
-                "integrity_impact": cvss_data.get("integrityImpact"),
-                "availability_impact": cvss_data.get("availabilityImpact"),
-                "exploitability_score": metric.get("exploitabilityScore"),
-                "impact_score": metric.get("impactScore"),
-            }
-        )
-    cvss_v3_df = pd.DataFrame(cvss_v3_metrics) if cvss_v3_metrics else pd.DataFrame()
-
-    # 4. CVSS v2 Metrics DataFrame
-    cvss_v2_metrics = []
-    for metric in cve_entry.get("metrics", {}).get("cvssMetricV2", []):
-        cvss_data = metric.get("cvssData", {})
-        cvss_v2_metrics.append(
-            {
-                "cve_id": cve_entry.get("id"),
-                "source": metric.get("source"),
-                "type": metric.get("type"),
-                "version": cvss_data.get("version"),
-                "vector_string": cvss_data.get("vectorString"),
-                "base_score": cvss_data.get("baseScore"),
-                "base_severity": metric.get("baseSeverity"),
-                "access_vector": cvss_data.get("accessVector"),
-                "access_complexity": cvss_data.get("accessComplexity"),
-                "authentication": cvss_data.get("authentication"),
-                "confidentiality_impact": cvss_data.get("confidentialityImpact"),
-                "integrity_impact": cvss_data.get("integrityImpact"),
-                "availability_impact": cvss_data.get("availabilityImpact"),
-                "exploitability_score": metric.get("exploitabilityScore"),
-                "impact_score": metric.get("impactScore"),
-                "ac_insuf_info": metric.get("acInsufInfo"),
-                "obtain_all_privilege": metric.get("obtainAllPrivilege"),
-                "obtain_user_privilege": metric.get("obtainUserPrivilege"),
-                "obtain_other_privilege": metric.get("obtainOtherPrivilege"),
-                "user_interaction_required": metric.get("userInteractionRequired"),
-            }
-        )
-    cvss_v2_df = pd.DataFrame(cvss_v2_metrics) if cvss_v2_metrics else pd.DataFrame()
-
-    # 5. Weaknesses DataFrame
-    weaknesses = []
-    for weakness in cve_entry.get("weaknesses", []):
-        for desc in weakness.get("description", []):
-            weaknesses.append(
-                {
-                    "cve_id": cve_entry.get("id"),
-                    "source": weakness.get("source"),
-                    "type": weakness.get("type"),
-                    "lang": desc.get("lang"),
-                    "cwe_id": desc.get("value"),  # Often contains CWE ID
-                }
-            )
-    weaknesses_df = pd.DataFrame(weaknesses) if weaknesses else pd.DataFrame()
-
-    # 6. CPE (Affected Products) DataFrame
-    affected_products = []
-    for config in cve_entry.get("configurations", []):
-        for node in config.get("nodes", []):
-            for cpe_match in node.get("cpeMatch", []):
-                affected_products.append(
-                    {
-                        "cve_id": cve_entry.get("id"),
-                        "vulnerable": cpe_match.get("vulnerable"),
-                        "criteria": cpe_match.get("criteria"),
-                        "version_end_including": cpe_match.get("versionEndIncluding"),
-                        "match_criteria_id": cpe_match.get("matchCriteriaId"),
-                    }
-                )
-    cpe_df = pd.DataFrame(affected_products) if affected_products else pd.DataFrame()
-
-    # 7. References DataFrame
-    references = []
-    for ref in cve_entry.get("references", []):
-        references.append(
-            {
-                "cve_id": cve_entry.get("id"),
-                "url": ref.get("url"),
-                "source": ref.get("source"),
-                "tags": ", ".join(
-                    ref.get("tags", [])
-                ),  # Combine tags into a single string
-            }
-        )
-    references_df = pd.DataFrame(references) if references else pd.DataFrame()
-    result = {
-        "main": main_df,
-        "descriptions": descriptions_df,
-        "cvss_v3": cvss_v3_df,
-        "cvss_v2": cvss_v2_df,
-        "weaknesses": weaknesses_df,
-        "affected_products": cpe_df,
-        "references": references_df,
+    # 4. CVSS v2 Metrics rows
+    metric, metric_ids = _explode(metrics, "cvssMetricV2", ids)
+    cvss_data = field(metric, "cvssData")
+    columns["cvss_v2"] = {
+        "cve_id": metric_ids,
+        "source": field(metric, "source"),
+        "type": field(metric, "type"),
+        "version": field(cvss_data, "version"),
+        "vector_string": field(cvss_data, "vectorString"),
+        "base_score": field(cvss_data, "baseScore"),
+        "base_severity": field(metric, "baseSeverity"),
+        "access_vector": field(cvss_data, "accessVector"),
+        "access_complexity": field(cvss_data, "accessComplexity"),
+        "authentication": field(cvss_data, "authentication"),
+        "confidentiality_impact": field(cvss_data, "confidentialityImpact"),
+        "integrity_impact": field(cvss_data, "integrityImpact"),
+        "availability_impact": field(cvss_data, "availabilityImpact"),
+        "exploitability_score": field(metric, "exploitabilityScore"),
+        "impact_score": field(metric, "impactScore"),
+        "ac_insuf_info": field(metric, "acInsufInfo"),
+        "obtain_all_privilege": field(metric, "obtainAllPrivilege"),
+        "obtain_user_privilege": field(metric, "obtainUserPrivilege"),
+        "obtain_other_privilege": field(metric, "obtainOtherPrivilege"),
+        "user_interaction_required": field(metric, "userInteractionRequired"),
+    }
+
+    # 5. Weaknesses rows: one per description, carrying its weakness' source and type
+    weakness, weakness_ids = _explode(cves, "weaknesses", ids)
+    desc, desc_ids = _explode(weakness, "description", weakness_ids)
+    parent = pc.list_parent_indices(field(weakness, "description"))
+    columns["weaknesses"] = {
+        "cve_id": desc_ids,
+        "source": pc.take(field(weakness, "source"), parent),
+        "type": pc.take(field(weakness, "type"), parent),
+        "lang": field(desc, "lang"),
+        "cwe_id": field(desc, "value"),  # Often contains CWE ID
     }
 
-    # Return all DataFrames in a dictionary
-    return result
+    # 6. CPE (Affected Products) rows
+    config, config_ids = _explode(cves, "configurations", ids)
+    node, node_ids = _explode(config, "nodes", config_ids)
+    cpe_match, cpe_ids = _explode(node, "cpeMatch", node_ids)
+    columns["affected_products"] = {
+        "cve_id": cpe_ids,
+        "vulnerable": field(cpe_match, "vulnerable"),
+        "criteria": field(cpe_match, "criteria"),
+        "version_end_including": field(cpe_match, "versionEndIncluding"),
+        "match_criteria_id": field(cpe_match, "matchCriteriaId"),
+    }
+
+    # 7. References rows
+    ref, ref_ids = _explode(cves, "references", ids)
+    columns["references"] = {
+        "cve_id": ref_ids,
+        "url": field(ref, "url"),
+        "source": field(ref, "source"),
+        # Combine tags into a single string
+        "tags": pc.fill_null(pc.binary_join(field(ref, "tags"), ", "), ""),
+    }
+    return columns
+
+
+def _load_cell(cell: str) -> List[Dict[str, Any]]:
+    """One cell as Python records: JSON first, the Python repr of older raw files second."""
+    try:
+        return orjson.loads(cell)
+    except orjson.JSONDecodeError:
+        return ast.literal_eval(cell)
+
+
+def _parse_pages(cells: List[Any]) -> pa.StructArray:
+    """
+    Parse stored vulnerabilities cells into one NVD_RECORD array. ingest writes JSON, read
+    here by Arrow's JSON reader. Cells Arrow rejects (older raw files hold the Python repr
+    of the list) are loaded one by one instead. Failed pages are empty cells.
+    """
+    cells = [c for c in cells if isinstance(c, str) and c]
+    if not cells:
+        return pa.array([], type=NVD_RECORD)
+    # One JSON object per page: {"v": [<record>, ...]}
+    data = b"\n".join(b'{"v":' + c.encode() + b"}" for c in cells)
+    try:
+        pages = pa_json.read_json(
+            pa.BufferReader(data),
+            read_options=pa_json.ReadOptions(use_threads=False, block_size=len(data) + 1),
+            parse_options=pa_json.ParseOptions(
+                explicit_schema=PAGE_SCHEMA, unexpected_field_behavior="ignore"
+            ),
+        )
+    except pa.ArrowInvalid:
+        records = itertools.chain.from_iterable(_load_cell(c) for c in cells)
+        return pa.array(list(records), type=NVD_RECORD)
+    return pc.list_flatten(pages.column("v").combine_chunks())
+
+
+def _drop_duplicates(table: pa.Table, subset=None) -> pa.Table:
+    """Keep the first row of every distinct `subset` key (all columns by default), in order."""
+    keys = subset or table.column_names
+    first = (
+        table.append_column("_row", pa.array(np.arange(table.num_rows)))
+        .group_by(keys, use_threads=False)
+        .aggregate([("_row", "min")])
+        .column("_row_min")
+    )
+    if len(first) == table.num_rows:
+        return table
+    return table.take(np.sort(first.to_numpy()))
 
 
-def process_batch(batch: Dict, output_path=PROCESSED_DATA_DIR, batch_idx=None):
+def process_batch(records: pa.StructArray, batch_idx=None):
     """
-    Processes a batch of cve_data at once in increments
+    Processes a batch of CVE records at once
     Args:
-        batch: list of CVE data dictionaries
-        output_path: Optional path of output saved file
+        records: NVD_RECORD struct array, one element per CVE
         batch_idx: Optional index of batch
     Returns:
-        Dictionary of DataFrames or None if saving to File
+        Dictionary of Arrow tables keyed by group, laid out per SCHEMAS
     """
 
-    batch_dfs = {}
-    file_paths = []
+    tables = {}
 
     try:
-        # Process each CVE in the batch
-        for cve_data in (batch):
-            cve_dfs = process_cve_data(cve_data)
-
-            for name, df in cve_dfs.items():
-                # LOGGER.info(f"name: {name} + df: {type(df)}")
-
-                if name not in batch_dfs:
-                    batch_dfs[name] = pd.DataFrame(df)
-                else:
-                    batch_dfs[name] = pd.concat(
-                        [batch_dfs[name], pd.DataFrame(df)], ignore_index=True
-                    )
-
-        for key, val in batch_dfs.items():
-            file_path = os.path.join(output_path, f"{key}_batch{batch_idx}.csv")
-            val.to_csv(file_path, index=False)
-            file_paths.append(file_path)
-            # LOGGER.info(f"Saved {file_path} with {len(val)} rows")
-        del batch_dfs
+        for key, columns in shred_cves(records).items():
+            if not len(columns["cve_id"]):
+                continue
+            table = pa.table(columns, schema=SCHEMAS[key])
+            # Repeats inside the batch are dropped here, repeats across batches on write
+            tables[key] = _drop_duplicates(table, ["cve_id"] if key == "main" else None)
     except Exception as e:
-        LOGGER.error(f"Error processing CVE: {str(e)}", exc_info=True)
-    gc.collect()
-    return file_paths
+        LOGGER.error(f"Error processing CVE batch {batch_idx}: {str(e)}", exc_info=True)
+    return tables
+
+
+def _write_pages_ipc(cells: pa.ChunkedArray, column_name: str, path: str) -> None:
+    """Spill the raw response pages to an Arrow IPC file that workers memory-map."""
+    table = pa.table({column_name: cells.cast(pa.string())})
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _init_worker() -> None:
+    """Raise the gen-0 threshold: the legacy repr path allocates dicts in bulk."""
+    gc.set_threshold(100_000, 10, 10)
+
+
+def process_pages(task):
+    """
+    Worker entry point: map the IPC file, parse pages [start, stop) and process their CVEs.
+    Only the small task tuple is pickled in; Arrow tables come back. A page that cannot be
+    parsed raises rather than silently dropping its CVEs.
+    """
+    path, column_name, start, stop, batch_idx = task
+    with pa.memory_map(path) as source:
+        column = pa.ipc.open_file(source).read_all().column(column_name)
+        cells = column.slice(start, stop - start).to_pylist()
+    return process_batch(_parse_pages(cells), batch_idx)
+
+
+def write_batch_tables(tables, writers, seen_ids: pa.Array) -> pa.Array:
+    """
+    Append one batch's tables to the per-group writers, skipping CVEs already written
+    by an earlier batch so each CVE lands in the dataset once, with the child rows of
+    its first batch. Returns seen_ids extended with the newly written ids.
+    """
+    if "main" not in tables:
+        return seen_ids
+    main_ids = pc.unique(tables["main"].column("cve_id"))
+    new_ids = main_ids.filter(pc.invert(pc.is_in(main_ids, value_set=seen_ids)))
+
+    for name, table in tables.items():
+        if len(new_ids) < len(main_ids):
+            table = table.filter(pc.is_in(table.column("cve_id"), value_set=new_ids))
+        writers[name].write_table(table)
+    return pa.concat_arrays([seen_ids, new_ids])
 
 
 def process_cve_batches(
-    df,
+    table,
     column_name="vulnerabilities",
-    batch_size=1000,
-    output_path=None,
+    pages_per_task=1,
+    writers=None,
     n_workers=None,
-    incremental_save=True,
 ):
     """
     The useful column in the API response is the "vulnerabilities" column.
-    Vulnerabilities must be converted to a dict then multiple Dataframes turned CSV files.
+    Vulnerabilities must be converted to a dict then multiple tables streamed to Parquet.
 
     Args:
-        df: Input DataFrame containing CVE data in string format
+        table: Input Arrow table containing CVE data in string format, one API page per row
         column_name: "vulnerabilities"
-        batch_size: # of CVEs per batch
+        pages_per_task: # of API pages (up to 2000 CVEs each) handed to a worker at once
+        writers: Dict of group name -> pyarrow ParquetWriter opened with SCHEMAS
         n_workers: Number of worker Processes
-        incremental_save: Whether to save Results incrementally
 
     Returns:
-        Dict of combined DataFrames
+        Number of unique CVEs written
     """
 
-    # Extract CVEs through apply mehtod
-    LOGGER.info(f"Extracting CVE {column_name} column from Dataframe")
-
-    # Extract Vulnerabilities Column dictionary
-    cve_list = []
-    for _, row in tqdm(df.iterrows()):
-        templist = ast.literal_eval(row[column_name])
-        cve_list.extend(templist)
-
-    # Batch Extracted CVE entries from the DataFrame
-    LOGGER.info(f"Extracted {len(cve_list)} CVE entries from the DataFrame")
-    batches = []
-    for i in range(0, len(cve_list), batch_size):
-        batches.append(cve_list[i : i + batch_size])
-    batches.append(
-        cve_list[len(cve_list) - (len(cve_list) // batch_size) : len(cve_list)]
-    )
-    LOGGER.info(f"Split CVEs into {len(batches)} batches of size {batch_size}")
+    if not writers:
+        LOGGER.info("Not Processing Today")
+        return 0
+
+    n_pages = table.num_rows
+    seen_ids = pa.array([], type=pa.string())
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Pages go to workers by row range over a shared IPC file instead of pickled dicts
+        LOGGER.info(f"Staging CVE {column_name} column from input table")
+        ipc_path = os.path.join(tmp_dir, f"{column_name}.arrow")
+        _write_pages_ipc(table.column(column_name), column_name, ipc_path)
+        tasks = [
+            (ipc_path, column_name, start, min(start + pages_per_task, n_pages), i)
+            for i, start in enumerate(range(0, n_pages, pages_per_task))
+        ]
+        LOGGER.info(f"Split {n_pages} pages into {len(tasks)} tasks of {pages_per_task} pages")
 
-    # Use concurrent.futures' Process Pool Executor to run processes in parallel
-    if incremental_save and output_path:
+        # Workers parse; the parent owns the writers and appends batches in task order, so
+        # a CVE repeated across pages is always taken from its lowest batch_idx
         if n_workers and n_workers > 1:
-            try:
-                # Parallel Processing Pool Executor to work multiple batch jobs at once
-                with ProcessPoolExecutor(max_workers=n_workers) as exec:
-
-                    # Schedules the partial process function to be executed
-                    process_fn = functools.partial(process_batch)
-                    futures = [
-                        exec.submit(process_fn, batch, batch_idx=i)
-                        for i, batch in tqdm(enumerate(batches))
-                    ]
-
-                    # Callback to fire when the future is done
-                    for future in as_completed(futures):
-                        try:
-                            future.result()
-                        except Exception as e:
-                            LOGGER.error(f"Batch Processsing error: {e}")
-            except Exception as e:
-                LOGGER.error(f"Processing Error")
+            # Workers are recycled after a fixed number of tasks, which returns their
+            # memory to the OS instead of collecting after every batch
+            with multiprocessing.Pool(
+                n_workers, initializer=_init_worker, maxtasksperchild=50
+            ) as pool:
+                results = pool.imap(process_pages, tasks, chunksize=4)
+                for tables in tqdm(results, total=len(tasks), mininterval=1.0):
+                    seen_ids = write_batch_tables(tables, writers, seen_ids)
         else:
             LOGGER.info("Processing Batches Sequentially")
-            for i, batch in enumerate(tqdm(batches)):
-                process_batch(batch, output_path, i)
+            for task in tqdm(tasks, mininterval=1.0):
+                seen_ids = write_batch_tables(process_pages(task), writers, seen_ids)
 
-        return
-    else:
-        LOGGER.info("Not Processing Today")
-        return
-
-
-def merge_batch_results(input_path, output_path):
-    """
-    Merge batch CSV files in the output directory into combined files.
-
-    Args:
-        output_path: Directory containing batch CSV files
-    """
-    LOGGER.info(f"Merging batch results in {input_path}")
-
-    # Get all CSV files
-    csv_files = [f for f in os.listdir(input_path) if f.endswith(".csv")]
-
-    # Categorically divide csv files into groups by
-    csv_groups = {}
-    for file in csv_files:
-        chunks = file.split("_batch")
-        if chunks[0] not in csv_groups:
-            csv_groups[chunks[0]] = [file]
-        else:
-            csv_groups[chunks[0]].append(file)
-
-    # For each File Group in Directory,
-    for group, files in tqdm(csv_groups.items()):
-        LOGGER.info(f"Merging {len(files)} files for {group}")
-        dfs = []
-        # loops = 2 if group == "descriptions" else 1
-        loops = 1
-
-        for loop in range(1, loops + 1):
-            length = int(len(files) / loops)
-            for i in range(length * (loop - 1), (length * loop)):
-                file_path = os.path.join(input_path, files[i])
-                try:
-                    # df = pd.read_csv(file_path)
-                    chunks = []
-                    # if group == "descriptions":
-                    #     df = df[df["lang"] == "en"]
-                    for chunk in pd.read_csv(file_path, chunksize=10000):
-                        chunks.append(chunk)
-                    dfs.append(pd.concat(chunks, ignore_index=True))
-                except Exception as e:
-                    LOGGER.error(f"Error reading {file_path}: {e}")
-
-            if dfs:
-                combined_df = pd.concat(dfs, ignore_index=True)
-                if "cve_id" in combined_df.columns:
-                    initial_len = len(combined_df)
-                    if group == "main":
-                        combined_df = combined_df.drop_duplicates(subset=["cve_id"])
-
-                    else:
-                        if "cve_id" in combined_df.columns:
-                            combined_df = combined_df.drop_duplicates()
-
-                    if initial_len > len(combined_df):
-                        LOGGER.info(
-                            f"Removed {initial_len} with {len(combined_df)} rows. "
-                        )
-
-                combined_path = os.path.join(output_path, f"{group}_combined{loop}.csv")
-                combined_df.to_csv(combined_path)
-                LOGGER.info(
-                    f"Saved combined file {combined_path} with {len(combined_df)} rows. "
-                )
-        del dfs, combined_df
-    LOGGER.info(f"Completed Merge of {len(csv_files)} Files.")
+    LOGGER.info(f"Extracted {len(seen_ids)} unique CVE entries")
+    return len(seen_ids)
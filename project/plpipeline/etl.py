@@ -1,15 +1,14 @@
 from pathlib import Path
 import typer
 from extract import ExtractCVE
-from dotenv import load_dotenv
 import os
-from plconfig import RAW_DATA_DIR
+from plconfig import RAW_DATA_DIR, load_env
 import polars as pl
 import tqdm
 
 
 app = typer.Typer()
-load_dotenv()
+load_env()
 
 
 @app.command()
@@ -26,16 +25,14 @@ def main(
     )
     # year range of the cve data we want to pull
     year_range = [2020, 2025]
-    # Process the DataFrame
-    nvd = extractor.extract(
+    # Pages are written to CVE_Parquet as they arrive
+    n_pages = extractor.extract(
         dates=year_range,
         endpoint="",
-        batch_size=10,
+        output_path=CVE_Parquet,
         API_KEY=api_key,
     )
-    print("Extracted Nvd data")
-
-    nvd.write_parquet(CVE_Parquet)
+    print(f"Extracted {n_pages} pages of Nvd data successfully")
 
     df = pl.read_parquet(CVE_Parquet)
     print(df.head()["vulnerabilities"])
@@ -1,14 +1,20 @@
-import polars as pl
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import aiohttp
 import asyncio
-import time
+from aiolimiter import AsyncLimiter
 from tqdm.auto import tqdm
 import logging
-from typing import List, Dict, Any, Callable, Optional, Union, Tuple
+from typing import List, Dict, Any, Callable, Mapping, Optional, Sequence, Union, Tuple
 
 from dataclasses import dataclass
-from datetime import date
+from datetime import datetime, timezone
+from pathlib import Path
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from types import MappingProxyType
 
 import calendar
 
@@ -24,6 +30,41 @@ class APIResponse:
     status_code: Optional[int] = None
 
 
+PARAM_NAMES = ["pubStartDate", "pubEndDate", "startIndex"]
+# NVD's maximum page size
+RESULTS_PER_PAGE = 2000
+# Extra attempts for a month's first page, which the rest of the month depends on
+FIRST_PAGE_RETRIES = 3
+# Responses are streamed to Parquet, so the layout is fixed up front; each page's
+# vulnerabilities list is stored as its JSON text
+RESULT_SCHEMA = pa.schema(
+    [
+        ("query_pubStartDate", pa.string()),
+        ("query_pubEndDate", pa.string()),
+        ("query_startIndex", pa.int32()),
+        ("success", pa.bool_()),
+        ("status_code", pa.int16()),
+        ("vulnerabilities", pa.string()),
+        ("error", pa.string()),
+    ]
+)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date form)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
 class ExtractCVE:
     def __init__(
         self,
@@ -38,8 +79,9 @@ class ExtractCVE:
         self.rate_limit_per_minute = rate_limit_per_minute
         self.timeout = timeout
         self.retries = retries
-        self.request_interval = 60 / rate_limit_per_minute
-        self.last_request_time = 0
+        # Token bucket shared by all requests; it binds to the event loop, so _run_all
+        # creates it
+        self._limiter: Optional[AsyncLimiter] = None
 
         # Configure logging
         logging.basicConfig(
@@ -48,51 +90,69 @@ class ExtractCVE:
         self.logger = logging.getLogger(__name__)
 
     # extract date-time strings for each month within date range
-    def _get_Params(self, start_year, end_year):
+    # Depends only on the year range, so it is built once and shared read-only
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _get_Params(start_year, end_year) -> Tuple[Mapping[str, Any], ...]:
         months = []
         for year in range(start_year, end_year + 1):
             for month in range(1, 13):
-                for i in range(0, 6000, 2000):
-                    _, last_date = calendar.monthrange(year, month)
-                    start_date = date(year, month, 1)
-                    end_date = date(year, month, last_date)
-                    dict = {
-                        "pubStartDate": f"{year}-{start_date.strftime("%m")}-01T00:00:00.000",
-                        "pubEndDate": f"{year}-{end_date.strftime("%m")}-{last_date}T23:59:59.999",
-                        "startIndex": i,
-                    }
-                    months.append(dict)
-        return months
+                _, last_date = calendar.monthrange(year, month)
+                # First page only; later pages are queued once totalResults is known
+                params = {
+                    "pubStartDate": f"{year}-{month:02d}-01T00:00:00.000",
+                    "pubEndDate": f"{year}-{month:02d}-{last_date}T23:59:59.999",
+                    "resultsPerPage": RESULTS_PER_PAGE,
+                    "startIndex": 0,
+                }
+                months.append(MappingProxyType(params))
+        return tuple(months)
+
+    @staticmethod
+    def _next_pages(response: APIResponse) -> List[Dict[str, Any]]:
+        """Params for the remaining pages of a month, read off its first page."""
+        if not response.success or response.query_params["startIndex"] != 0:
+            return []
+        total = response.data.get("totalResults", 0)
+        return [
+            {**response.query_params, "startIndex": start}
+            for start in range(RESULTS_PER_PAGE, total, RESULTS_PER_PAGE)
+        ]
 
     async def _make_request(
         self, session, url: str, params: Dict[str, Any], headers: Dict[str, Any]
     ) -> APIResponse:
         try:
-            # Apply rate limiting
-            current_time = time.time()
-            time_since_last_request = current_time - self.last_request_time
-            if time_since_last_request < self.request_interval:
-                await asyncio.sleep(self.request_interval - time_since_last_request)
-
-            self.last_request_time = time.time()
-
-            async with session.get(url, params=params, headers=headers) as response:
-                status = response.status
-
-                if status >= 200 and status < 300:
-                    data = await response.json()
-                    return APIResponse(
-                        success=True, data=data, query_params=params, status_code=status
-                    )
-                else:
-                    error_text = await response.text()
-                    return APIResponse(
-                        success=False,
-                        data=None,
-                        error=f"HTTP Error {status}: {error_text}",
-                        query_params=params,
-                        status_code=status,
-                    )
+            for attempt in range(self.retries + 1):
+                retry_after = None
+                # Apply rate limiting: the shared token bucket admits each attempt
+                async with self._limiter:
+                    async with session.get(url, params=params, headers=headers) as response:
+                        status = response.status
+
+                        if status >= 200 and status < 300:
+                            data = await response.json()
+                            return APIResponse(
+                                success=True, data=data, query_params=params, status_code=status
+                            )
+
+                        error_text = await response.text()
+                        if status in (429, 503):
+                            retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                        if retry_after is None or attempt == self.retries:
+                            return APIResponse(
+                                success=False,
+                                data=None,
+                                error=f"HTTP Error {status}: {error_text}",
+                                query_params=params,
+                                status_code=status,
+                            )
+
+                # Throttled: wait as long as the server asked before trying again
+                self.logger.warning(
+                    f"HTTP {status}, retrying in {retry_after:.1f}s (attempt {attempt + 1})"
+                )
+                await asyncio.sleep(retry_after)
 
         except asyncio.TimeoutError:
             return APIResponse(
@@ -116,101 +176,143 @@ class ExtractCVE:
     async def _fetch_data(
         self,
         session: aiohttp.ClientSession,
+        url: str,
+        params_list: Sequence[Mapping[str, Any]],
+        headers: Dict[str, Any],
+        writer: pq.ParquetWriter,
+        flush_every: int,
+    ) -> int:
+        # The semaphore caps in-flight requests; every request is queued up front
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        async def fetch(params, delay=0.0):
+            await asyncio.sleep(delay)
+            async with semaphore:
+                return await self._make_request(session, url, params, headers)
+
+        def submit(params, attempt=0):
+            task = asyncio.ensure_future(fetch(params, 2**attempt - 1))
+            attempts[task] = (params, attempt)
+            return task
+
+        # Responses are flushed in completion order as they arrive, so at most
+        # flush_every pages are held in memory. A month's later pages are queued
+        # as soon as its first page reports totalResults
+        attempts = {}
+        tasks = {submit(params) for params in params_list}
+        pending = []
+        skipped_months = []
+        fetched = 0
+        with tqdm(total=len(tasks)) as progress:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    params, attempt = attempts.pop(task)
+                    response = task.result()
+                    # Without its first page a month's later pages are never queued,
+                    # so a failed first page is retried before giving up on the month
+                    if not response.success and params["startIndex"] == 0:
+                        if attempt < FIRST_PAGE_RETRIES:
+                            tasks.add(submit(params, attempt + 1))
+                            continue
+                        skipped_months.append(params["pubStartDate"][:7])
+
+                    next_pages = self._next_pages(response)
+                    tasks.update(submit(params) for params in next_pages)
+                    progress.total += len(next_pages)
+                    progress.update(1)
+
+                    pending.append(response)
+                    if len(pending) >= flush_every:
+                        fetched += await self._flush(writer, pending)
+        if pending:
+            fetched += await self._flush(writer, pending)
+        if skipped_months:
+            self.logger.warning(
+                f"First page failed for {len(skipped_months)} months, their later pages "
+                f"were not requested: {', '.join(sorted(skipped_months))}"
+            )
+        return fetched
+
+    async def _flush(self, writer: pq.ParquetWriter, responses: List[APIResponse]) -> int:
+        """Write the buffered responses; returns how many of them succeeded."""
+        batch = self._record_batch(responses)
+        n_success = sum(response.success for response in responses)
+        responses.clear()
+        # Parquet encoding runs off the event loop so downloads keep going meanwhile
+        await asyncio.to_thread(writer.write_batch, batch)
+        return n_success
+
+    async def _run_all(
+        self,
+        params: Sequence[Mapping[str, Any]],
         endpoint: str,
-        batch_params: List[Dict],
+        writer: pq.ParquetWriter,
+        flush_every: int,
         API_KEY: Optional[str] = None,
-    ) -> List[APIResponse]:
+    ) -> int:
+        self._limiter = AsyncLimiter(self.rate_limit_per_minute, 60)
 
+        # URL and headers are fixed for the run, so they are built once
         url = f"{self.BASE_URL}/{endpoint}"
         headers = {"apiKey": API_KEY} if API_KEY else {}
-        tasks = []
-        for params in batch_params:
-            task = self._make_request(session, url, params, headers)
-            tasks.append(task)
-        return await asyncio.gather(*tasks)
 
-    async def _process_batch(
-        self,
-        batch_params,
-        endpoint,
-        API_KEY,
-    ):
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
+        # One connection pool for every request keeps DNS + TLS warm
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent_requests, ttl_dns_cache=300, keepalive_timeout=60
+        )
         timeout = aiohttp.ClientTimeout(total=self.timeout)
-
         try:
             async with aiohttp.ClientSession(
                 connector=connector, timeout=timeout
             ) as session:
-                return await self._fetch_data(session, endpoint, batch_params, API_KEY)
+                return await self._fetch_data(
+                    session, url, params, headers, writer, flush_every
+                )
         except Exception as e:
-            self.logger.error(f"Batch Processing Error: {e}")
+            self.logger.error(f"Extract Error: {e}")
+            return 0
 
     def extract(
         self,
         dates: List[int],
         endpoint: str,
-        batch_size: int = 10,
+        output_path: Union[str, Path],
         API_KEY: Optional[str] = None,
-    ):
+        flush_every: int = 8,
+    ) -> int:
+        """
+        Fetch every page for the year range into a Parquet file, failed requests included
+        as rows with success=False; returns the number of pages fetched successfully.
+        """
         params = self._get_Params(dates[0], dates[1])
-        total_items = len(params)
-        results = []
-        for i in range(0, total_items, batch_size):
-            batch_params = params[i : i + batch_size]
-            self.logger.info(
-                f"Processing batch {i // batch_size+1} / {(total_items -1)// batch_size+1}: {len(batch_params)} items"
+        self.logger.info(f"Requesting first pages for {len(params)} months")
+        with pq.ParquetWriter(output_path, RESULT_SCHEMA) as writer:
+            return asyncio.run(
+                self._run_all(params, endpoint, writer, flush_every, API_KEY)
             )
 
-            try:
-                batch_results = asyncio.run(
-                    self._process_batch(
-                        batch_params,
-                        endpoint,
-                        API_KEY,
-                    )
-                )
-                results.extend(batch_results)
-            except Exception as e:
-                self.logger.error(f"Batch Processing Error: {e}")
-            if i + batch_size < total_items:
-                time.sleep(1)
-        return self._result_handler(results)
-
-    def _result_handler(self, results):
-        processed_data = []
-        param_names = ["pubStartDate", "pubEndDate", "startIndex"]
-        for response in results:
-            result_dict = {}
-
+    def _record_batch(self, responses: List[APIResponse]) -> pa.RecordBatch:
+        # Columns are filled in one pass and converted together with the fixed schema
+        cols = {name: [] for name in RESULT_SCHEMA.names}
+        for response in responses:
             # Add query parameters
-            if response.query_params:
-                for name in param_names:
-                    if name in response.query_params:
-                        result_dict[f"query_{name}"] = response.query_params[name]
+            query_params = response.query_params or {}
+            for name in PARAM_NAMES:
+                cols[f"query_{name}"].append(query_params.get(name))
 
             # Add status information
-            result_dict["success"] = response.success
-            result_dict["status_code"] = response.status_code
-
-            if response.success:
-                # If response data is a dict, flatten top-level keys
-                if isinstance(response.data, dict):
-                    for key, value in response.data.items():
-                        # Don't include nested objects/arrays as separate columns
-                        if not isinstance(value, (dict, list)):
-                            result_dict[key] = value
-                        else:
-                            # Store complex data as is
-                            result_dict[key] = value
-                else:
-                    result_dict["data"] = response.data
-            else:
-                result_dict["error"] = response.error
-
-            processed_data.append(result_dict)
-
-        return pl.DataFrame(processed_data)
+            cols["success"].append(response.success)
+            cols["status_code"].append(response.status_code)
+
+            data = response.data if isinstance(response.data, dict) else {}
+            vulnerabilities = data.get("vulnerabilities")
+            cols["vulnerabilities"].append(
+                None if vulnerabilities is None else orjson.dumps(vulnerabilities).decode()
+            )
+            cols["error"].append(response.error)
+
+        return pa.RecordBatch.from_pydict(cols, schema=RESULT_SCHEMA)
 
 
 """
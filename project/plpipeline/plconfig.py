@@ -1,10 +1,18 @@
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
 from loguru import logger
 
+
+@lru_cache(maxsize=1)
+def load_env() -> bool:
+    """Parse .env once per process; later callers get the cached result."""
+    return load_dotenv()
+
+
 # Load environment variables from .env file if it exists
-load_dotenv()
+load_env()
 
 # Paths
 PROJ_ROOT = Path(__file__).resolve().parents[2]